@@ -1,11 +1,15 @@
 from flask import Flask
 from app.config import Config
 from app.extensions import db
+from app.json_provider import OrjsonProvider, orjson
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
     db.init_app(app)
 
     from app.controllers.parking_controller import parking_bp 
@@ -0,0 +1,229 @@
+import math
+import threading
+import time
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+
+
+class AdmissionRejected(Exception):
+
+    def __init__(self, reason, status_code=503, retry_after=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ('lane', 'event', 'granted', 'enqueued_at')
+
+    def __init__(self, lane):
+        self.lane = lane
+        self.event = threading.Event()
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class Reservation:
+    __slots__ = ('lane', 'deadline', 'active')
+
+    def __init__(self, lane, deadline):
+        self.lane = lane
+        self.deadline = deadline
+        self.active = True
+
+
+class AdmissionController:
+    """Bounds concurrent inference and queues waiting requests fairly per lane.
+
+    A fixed number of slots may run inference at once; a slot is only held
+    around decode, detection and OCR, not the upload read, storing the image
+    or database work. Before the upload body is read a request reserves a
+    queue position with reserve(), so the number of bodies buffered at once
+    is bounded by the free slots plus the queue limits. Requests that arrive
+    while every slot is busy wait in their lane's queue; freed slots are
+    handed out round-robin across lanes, so one busy gate cannot starve the
+    others.
+    Requests are shed with a retry hint when their lane queue is full, and
+    dropped when their deadline passes before a slot is granted.
+    """
+
+    def __init__(self, max_inflight=2, max_queue_per_lane=4, max_queue_total=16,
+                 max_queue_wait=5.0, sample_size=1000):
+        self.max_inflight = max_inflight
+        self.max_queue_per_lane = max_queue_per_lane
+        self.max_queue_total = max_queue_total
+        self.max_queue_wait = max_queue_wait
+
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._waiting = 0
+        # Reserved positions of requests still reading their upload body
+        self._pending = {}
+        self._pending_total = 0
+        # lane -> deque of tickets; iteration order is the round-robin order
+        self._lanes = OrderedDict()
+
+        self._admitted = 0
+        self._shed = {'queue_full': 0, 'queue_timeout': 0, 'deadline_exceeded': 0}
+        self._queue_waits = deque(maxlen=sample_size)
+        self._service_times = deque(maxlen=sample_size)
+
+    def _retry_after(self):
+        # Rough estimate of how long until a queued request would be served
+        if self._service_times:
+            avg_service = sum(self._service_times) / len(self._service_times)
+        else:
+            avg_service = 1.0
+        backlog = (self._pending_total + self._waiting + self._inflight) / max(self.max_inflight, 1)
+        return max(1, math.ceil(avg_service * backlog))
+
+    def _reject(self, reason):
+        self._shed[reason] += 1
+        status_code = 504 if reason == 'deadline_exceeded' else 503
+        retry_after = None if reason == 'deadline_exceeded' else self._retry_after()
+        return AdmissionRejected(reason, status_code, retry_after)
+
+    def _dispatch(self):
+        while self._inflight < self.max_inflight and self._lanes:
+            lane, queue = self._lanes.popitem(last=False)
+            ticket = queue.popleft()
+            if queue:
+                self._lanes[lane] = queue
+            self._waiting -= 1
+            self._inflight += 1
+            ticket.granted = True
+            ticket.event.set()
+
+    def _check_capacity(self, lane, deadline, now):
+        # Pending reservations count against the queue limits; free slots add
+        # to the total so an idle server still admits up to max_inflight more
+        if deadline is not None and deadline <= now:
+            raise self._reject('deadline_exceeded')
+
+        queue = self._lanes.get(lane)
+        lane_load = self._pending.get(lane, 0) + (len(queue) if queue else 0)
+        free_slots = max(self.max_inflight - self._inflight, 0)
+        if lane_load >= self.max_queue_per_lane or \
+                self._pending_total + self._waiting >= self.max_queue_total + free_slots:
+            raise self._reject('queue_full')
+
+    def _unreserve(self, reservation):
+        if not reservation.active:
+            return
+        reservation.active = False
+        self._pending_total -= 1
+        self._pending[reservation.lane] -= 1
+        if not self._pending[reservation.lane]:
+            del self._pending[reservation.lane]
+
+    @contextmanager
+    def reserve(self, lane='default', deadline=None):
+        with self._lock:
+            self._check_capacity(lane, deadline, time.monotonic())
+            self._pending[lane] = self._pending.get(lane, 0) + 1
+            self._pending_total += 1
+
+        reservation = Reservation(lane, deadline)
+        try:
+            yield reservation
+        finally:
+            # No-op if acquire() already took the reservation over
+            with self._lock:
+                self._unreserve(reservation)
+
+    def acquire(self, lane='default', deadline=None, reservation=None):
+        if reservation is not None:
+            lane, deadline = reservation.lane, reservation.deadline
+
+        now = time.monotonic()
+        with self._lock:
+            slot_free = self._inflight < self.max_inflight and not self._lanes
+            if reservation is not None and reservation.active:
+                # The reserved position moves to the slot or the lane queue
+                self._unreserve(reservation)
+            elif not slot_free:
+                self._check_capacity(lane, deadline, now)
+
+            if deadline is not None and deadline <= now:
+                raise self._reject('deadline_exceeded')
+
+            if slot_free:
+                self._inflight += 1
+                self._admitted += 1
+                self._queue_waits.append(0.0)
+                return now
+
+            queue = self._lanes.get(lane)
+            ticket = _Ticket(lane)
+            if queue is None:
+                queue = self._lanes[lane] = deque()
+            queue.append(ticket)
+            self._waiting += 1
+
+        timeout = self.max_queue_wait
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        ticket.event.wait(max(timeout, 0))
+
+        with self._lock:
+            now = time.monotonic()
+            if not ticket.granted:
+                queue = self._lanes.get(lane)
+                if queue is not None:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self._lanes[lane]
+                self._waiting -= 1
+                expired = deadline is not None and deadline <= now
+                raise self._reject('deadline_exceeded' if expired else 'queue_timeout')
+
+            if deadline is not None and deadline <= now:
+                # Granted too late to be useful: give the slot to the next waiter
+                self._inflight -= 1
+                self._dispatch()
+                raise self._reject('deadline_exceeded')
+
+            self._admitted += 1
+            self._queue_waits.append(now - ticket.enqueued_at)
+            return now
+
+    def release(self, started_at=None):
+        with self._lock:
+            if started_at is not None:
+                self._service_times.append(time.monotonic() - started_at)
+            self._inflight -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, lane='default', deadline=None, reservation=None):
+        started_at = self.acquire(lane, deadline, reservation)
+        try:
+            yield
+        finally:
+            self.release(started_at)
+
+    def get_stats(self):
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            stats = {
+                'max_inflight': self.max_inflight,
+                'inflight': self._inflight,
+                'waiting': self._waiting,
+                'pending': self._pending_total,
+                'waiting_per_lane': {lane: len(q) for lane, q in self._lanes.items()},
+                'admitted': self._admitted,
+                'shed': dict(self._shed),
+                'shed_total': sum(self._shed.values()),
+            }
+
+        if waits:
+            stats['queue_wait_ms'] = {
+                'avg': round(sum(waits) / len(waits) * 1000, 2),
+                'p50': round(waits[len(waits) // 2] * 1000, 2),
+                'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2),
+                'max': round(waits[-1] * 1000, 2),
+            }
+        else:
+            stats['queue_wait_ms'] = None
+        return stats
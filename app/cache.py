@@ -0,0 +1,60 @@
+import hashlib
+import threading
+import time
+
+
+class CachedResponse:
+    __slots__ = ('body', 'etag', 'expires_at')
+
+    def __init__(self, body, etag, expires_at):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Short-TTL cache of serialized JSON bodies for the read endpoints.
+
+    Entries are dropped wholesale by invalidate() whenever a vehicle enters
+    or exits. A body built while an invalidation happened is not stored, so
+    a slow reader cannot put pre-write data back into the cache.
+    """
+
+    def __init__(self, ttl=2.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def set(self, key, body, version):
+        etag = hashlib.md5(body).hexdigest()
+        entry = CachedResponse(body, etag, time.monotonic() + self.ttl)
+        if self.ttl <= 0:
+            return entry
+
+        with self._lock:
+            if version != self._version:
+                return entry
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: e for k, e in self._entries.items() if e.expires_at > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entries = {}
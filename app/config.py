@@ -7,4 +7,18 @@ class Config:
     UPLOAD_FOLDER = 'parking_images'
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
+    # Ingest normalization: downscaled copy for detection, re-encoded stored copy
+    INGEST_DETECT_MAX_SIDE = int(os.environ.get('INGEST_DETECT_MAX_SIDE', 1280))
+    INGEST_STORE_MAX_SIDE = int(os.environ.get('INGEST_STORE_MAX_SIDE', 1280))
+    INGEST_STORE_JPEG_QUALITY = int(os.environ.get('INGEST_STORE_JPEG_QUALITY', 85))
+
+    # TTL (seconds) of cached /current, /history and /license responses
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 2.0))
+
+    # Admission control for /entry and /exit
+    ADMISSION_MAX_INFLIGHT = int(os.environ.get('ADMISSION_MAX_INFLIGHT', 2))
+    ADMISSION_MAX_QUEUE_PER_LANE = int(os.environ.get('ADMISSION_MAX_QUEUE_PER_LANE', 4))
+    ADMISSION_MAX_QUEUE_TOTAL = int(os.environ.get('ADMISSION_MAX_QUEUE_TOTAL', 16))
+    ADMISSION_MAX_QUEUE_WAIT = float(os.environ.get('ADMISSION_MAX_QUEUE_WAIT', 5.0))
+
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
\ No newline at end of file
@@ -1,24 +1,70 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, current_app
 from app.services.parking_service import ParkingService
 import os
+import time
 from datetime import datetime
 from app.models.parking_db import ParkingRecord
-from app.extensions import db
+from app.extensions import db, admission, response_cache
+from app.admission import AdmissionRejected
 
 parking_bp = Blueprint('parking', __name__, url_prefix='/parking')
 
+def get_admission_args():
+    # Only headers/query args are read here so the upload body stays unparsed
+    # until the request holds an admission reservation
+    lane = request.headers.get('X-Lane-Id') or request.args.get('lane') or request.remote_addr or 'default'
+
+    deadline = None
+    timeout_ms = request.headers.get('X-Request-Timeout-Ms')
+    deadline_epoch = request.headers.get('X-Request-Deadline')
+    try:
+        if timeout_ms is not None:
+            deadline = time.monotonic() + float(timeout_ms) / 1000
+        elif deadline_epoch is not None:
+            deadline = time.monotonic() + (float(deadline_epoch) - time.time())
+    except ValueError:
+        deadline = None
+
+    return lane, deadline
+
+def shed_response(e):
+    response = jsonify({'success': False, 'error': 'Server busy' if e.status_code == 503 else 'Deadline exceeded',
+                        'reason': e.reason, 'retry_after': e.retry_after})
+    response.status_code = e.status_code
+    if e.retry_after is not None:
+        response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+def cached_json(build):
+    # Serve the cached body for this URL if fresh, otherwise build and cache it;
+    # the ETag lets pollers get a 304 when nothing has changed
+    key = request.full_path
+    cached = response_cache.get(key)
+    if cached is None:
+        version = response_cache.version
+        body = current_app.json.dumps(build()).encode('utf-8')
+        cached = response_cache.set(key, body, version)
+
+    response = current_app.response_class(cached.body, mimetype='application/json')
+    response.set_etag(cached.etag)
+    return response.make_conditional(request)
+
 @parking_bp.route('/entry', methods=['POST'])
 def entry():
     try:
-        if 'image' not in request.files:
-            return jsonify({'error': 'No image provided'}), 400
-        
-        file = request.files['image']
-        name = request.form.get('name', 'Unknown')
-        
-        data = ParkingService.handle_entry(file, name)
+        with admission.reserve(*get_admission_args()) as reservation:
+            if 'image' not in request.files:
+                return jsonify({'error': 'No image provided'}), 400
+
+            file = request.files['image']
+            name = request.form.get('name', 'Unknown')
+
+            data = ParkingService.handle_entry(file, name, reservation)
         return jsonify({'success': True, 'message': 'Entry recorded', 'record': data}), 200
 
+    except AdmissionRejected as e:
+        return shed_response(e)
+
     except ValueError as e:
         return jsonify({'success': False, 'error': str(e)}), 400
     
@@ -28,14 +74,18 @@ def entry():
 @parking_bp.route('/exit', methods=['POST'])
 def exit():
     try:
-        if 'image' not in request.files:
-            return jsonify({'error': 'No image provided'}), 400
-        
-        file = request.files['image']
-        
-        data = ParkingService.handle_exit(file)
+        with admission.reserve(*get_admission_args()) as reservation:
+            if 'image' not in request.files:
+                return jsonify({'error': 'No image provided'}), 400
+
+            file = request.files['image']
+
+            data = ParkingService.handle_exit(file, reservation)
         return jsonify({'success': True, 'message': 'Exit recorded', 'record': data}), 200
 
+    except AdmissionRejected as e:
+        return shed_response(e)
+
     except ValueError as e:
         status_code = 404 if "No entry record" in str(e) else 400
         return jsonify({'success': False, 'error': str(e)}), status_code
@@ -45,15 +95,21 @@ def exit():
     
 @parking_bp.route('/current', methods=['GET'])
 def get_current():
-    try:
-        records = ParkingRecord.query.filter_by(status='parked').order_by(ParkingRecord.entry_time.desc()).all()
-        
+    def build():
+        rows = ParkingRecord.lean_query().filter(
+            ParkingRecord.status == 'parked'
+        ).order_by(ParkingRecord.entry_time.desc()).all()
+
+        now = datetime.now()
         result = []
-        for record in records:
-            d = record.to_dict()
-            d['current_duration'] = int((datetime.now() - record.entry_time).total_seconds()/60)
+        for row in rows:
+            d = ParkingRecord.serialize(row)
+            d['current_duration'] = int((now - row.entry_time).total_seconds()/60)
             result.append(d)
-        return jsonify({'success': True, 'vehicle': result}), 200
+        return {'success': True, 'vehicle': result}
+
+    try:
+        return cached_json(build)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -69,55 +125,69 @@ def stats():
     except Exception as e:
          return jsonify({'error': str(e)}), 500
 
+@parking_bp.route('/admission', methods=['GET'])
+def admission_stats():
+    try:
+        return jsonify({'success': True, 'admission': admission.get_stats()}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @parking_bp.route('/history', methods=['GET'])
 def get_parking_history():
     
-    try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        license_plate = request.args.get('license_plate', None)
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    license_plate = request.args.get('license_plate', None)
 
-        query = ParkingRecord.query
+    def build():
+        query = ParkingRecord.lean_query()
 
         if license_plate:
-            query = query.filter_by(license_plate=license_plate.upper())
+            query = query.filter(ParkingRecord.license_plate == license_plate.upper())
 
         records = query.order_by(ParkingRecord.entry_time.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
-        return jsonify({
+        return {
             'success': True,
             'total': records.total,
             'page': page,
             'per_page': per_page,
-            'records': [r.to_dict() for r in records.items]
-        }), 200
+            'records': [ParkingRecord.serialize(r) for r in records.items]
+        }
+
+    try:
+        return cached_json(build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
     
 @parking_bp.route('/license/<license_plate>', methods=['GET'])
 def get_license_plate(license_plate):
     
-    try:
-        records = ParkingRecord.query.filter_by(
-            license_plate=license_plate.upper()
+    def build():
+        rows = ParkingRecord.lean_query().filter(
+            ParkingRecord.license_plate == license_plate.upper()
         ).order_by(ParkingRecord.entry_time.desc()).all()
 
         results = []
-        for record in records:
-            data = record.to_dict()
-            
-            data['entry_image_url'] = f'/parking/image/entry/{record.id}'
-            data['exit_image_url'] = f'/parking/image/exit/{record.id}' if record.exit_image_path else None
+        for row in rows:
+            data = ParkingRecord.serialize(row)
+
+            data['entry_image_url'] = f'/parking/image/entry/{row.id}'
+            data['exit_image_url'] = f'/parking/image/exit/{row.id}' if row.exit_image_path else None
             results.append(data)
 
-        return jsonify({
+        return {
             'success': True,
             'license_plate': license_plate.upper(),
             'total_records': len(results),
             'records': results
-        }), 200
+        }
+
+    try:
+        return cached_json(build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
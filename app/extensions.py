@@ -1,8 +1,20 @@
 from flask_sqlalchemy import SQLAlchemy
 from app.detector import LicensePlateDetector
+from app.admission import AdmissionController
+from app.cache import ResponseCache
+from app.config import Config
 
 db = SQLAlchemy()
 
+admission = AdmissionController(
+    max_inflight=Config.ADMISSION_MAX_INFLIGHT,
+    max_queue_per_lane=Config.ADMISSION_MAX_QUEUE_PER_LANE,
+    max_queue_total=Config.ADMISSION_MAX_QUEUE_TOTAL,
+    max_queue_wait=Config.ADMISSION_MAX_QUEUE_WAIT
+)
+
+response_cache = ResponseCache(ttl=Config.RESPONSE_CACHE_TTL)
+
 print("Loading AI Models...")
 detector = LicensePlateDetector(
     model_path='models/best.pt',
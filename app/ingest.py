@@ -0,0 +1,82 @@
+import cv2
+import numpy as np
+
+# EXIF orientation is ignored so pixel coordinates match the raw frame, as
+# they did when uploads were decoded through PIL
+DECODE_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+
+def decode_image(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), DECODE_FLAGS)
+
+def resize_max_side(img, max_side):
+    h, w = img.shape[:2]
+    if max(h, w) <= max_side:
+        return img
+    ratio = max_side / max(h, w)
+    return cv2.resize(img, (int(w * ratio), int(h * ratio)), interpolation=cv2.INTER_AREA)
+
+def crop_bbox(img, bbox):
+    h, w = img.shape[:2]
+    x1, y1, x2, y2 = map(int, bbox)
+    x1, y1 = max(x1, 0), max(y1, 0)
+    x2, y2 = min(x2, w), min(y2, h)
+    return img[y1:y2, x1:x2]
+
+def encode_jpeg(img, quality):
+    ok, encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Error encoding image")
+    return encoded.tobytes()
+
+def recognize_upload(data, detector, detect_max_side=1280):
+    """Decode an upload once, detect on a downscaled copy and OCR the full-resolution plate crop.
+
+    Returns the detection result, with the bbox in original image
+    coordinates as in detector.detect_and_recognize, and the decoded frame
+    for store_upload().
+    """
+    full_img = decode_image(data)
+    if full_img is None:
+        raise ValueError("Error processing image")
+
+    detect_img = resize_max_side(full_img, detect_max_side)
+    scale = full_img.shape[1] / detect_img.shape[1]
+
+    detection = detector.detect_plate(detect_img)
+    if not detection['detected']:
+        return {
+            'detected': False,
+            'license_plate': None,
+            'confidence': 0.0,
+            'bbox': None
+        }, full_img
+
+    bbox = [c * scale for c in detection['bbox']]
+
+    plate_img = crop_bbox(full_img, bbox)
+    license_text = detector.recognize_text(plate_img, bbox=None) if plate_img.size else ""
+
+    return {
+        'detected': True,
+        'license_plate': license_text if license_text else "UNKNOWN",
+        'confidence': detection['confidence'],
+        'bbox': bbox
+    }, full_img
+
+def store_upload(full_img, result, image_path, store_max_side=1280, store_quality=85):
+    # Only the normalized, annotated copy is written; the raw upload never touches disk
+    stored = resize_max_side(full_img, store_max_side)
+    ratio = stored.shape[1] / full_img.shape[1]
+    x1, y1, x2, y2 = (int(c * ratio) for c in result['bbox'])
+    cv2.rectangle(stored, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    cv2.putText(stored, f"{result['license_plate']}", (x1, y1-10),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+
+    with open(image_path, 'wb') as f:
+        f.write(encode_jpeg(stored, store_quality))
+
+def process_upload(data, detector, image_path, detect_max_side=1280, store_max_side=1280, store_quality=85):
+    result, full_img = recognize_upload(data, detector, detect_max_side)
+    if result['detected']:
+        store_upload(full_img, result, image_path, store_max_side, store_quality)
+    return result
@@ -16,15 +16,28 @@ class ParkingRecord(db.Model):
     has_monthly_ticket = db.Column(db.Boolean, default=False)
 
     def to_dict(self):
+        return ParkingRecord.serialize(self)
+
+    @classmethod
+    def lean_query(cls):
+        # Column-only query: rows are plain tuples, no ORM instances are built
+        return db.session.query(
+            cls.id, cls.license_plate, cls.entry_image_path, cls.exit_image_path,
+            cls.confidence, cls.entry_time, cls.exit_time, cls.status, cls.duration
+        )
+
+    @staticmethod
+    def serialize(row):
+        # Works for both ORM instances and rows from lean_query()
         return {
-            'id': self.id,
-            'license_plate': self.license_plate,
-            'entry_img_path': self.entry_image_path,
-            'exit_img_path': self.exit_image_path,
-            'confidence': self.confidence,
-            'entry_time': self.entry_time.isoformat() if self.entry_time else None,
-            'exit_time': self.exit_time.isoformat() if self.exit_time else None,
-            'status': self.status,
-            'parking_duration': self.duration
+            'id': row.id,
+            'license_plate': row.license_plate,
+            'entry_img_path': row.entry_image_path,
+            'exit_img_path': row.exit_image_path,
+            'confidence': row.confidence,
+            'entry_time': row.entry_time.isoformat() if row.entry_time else None,
+            'exit_time': row.exit_time.isoformat() if row.exit_time else None,
+            'status': row.status,
+            'parking_duration': row.duration
         }
 
@@ -1,13 +1,14 @@
 import os
-import cv2
 import urllib.parse
-import numpy as np
+import uuid
 from datetime import datetime
 from werkzeug.utils import secure_filename
-from app.extensions import db, detector
+from app.extensions import db, detector, admission, response_cache
 from app.models.parking_db import ParkingRecord
 from app.config import Config
-from app.utils import allowed_file, preprocess_img, calculate_fee
+from app.utils import allowed_file, calculate_fee
+from app.ingest import recognize_upload, store_upload
+from app.admission import AdmissionRejected
 import requests
 
 NODE_SERVER_URL = "http://192.168.1.13:4000/api"
@@ -49,44 +50,54 @@ class ParkingService:
     
         
     @staticmethod
-    def handle_entry(file, name='Unknown'):
-        if not file or not allowed_file(file.filename):
-            raise ValueError("Invalid file")
-
+    def process_image(file, prefix, reservation=None):
         filename = secure_filename(file.filename)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"entry_{timestamp}_{filename}"
+        # Stored copies are always re-encoded as JPEG; the uuid keeps uploads
+        # from the same second (or x.png vs x.jpg) from overwriting each other
+        unique_filename = f"{prefix}_{timestamp}_{uuid.uuid4().hex}_{os.path.splitext(filename)[0]}.jpg"
         image_path = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-        file.save(image_path)
+        data = file.read()
 
         try:
-            pil_image = preprocess_img(image_path)
-            result = detector.detect_and_recognize(pil_image)
+            # The slot covers decode, detection and OCR only; the stored copy
+            # is encoded and written after it is released
+            with admission.slot(reservation=reservation):
+                result, full_img = recognize_upload(
+                    data, detector, detect_max_side=Config.INGEST_DETECT_MAX_SIDE
+                )
+
+            if result['detected']:
+                store_upload(
+                    full_img, result, image_path,
+                    store_max_side=Config.INGEST_STORE_MAX_SIDE,
+                    store_quality=Config.INGEST_STORE_JPEG_QUALITY
+                )
+        except AdmissionRejected:
+            raise
         except Exception:
-            os.remove(image_path)
+            if os.path.exists(image_path):
+                os.remove(image_path)
             raise ValueError("Error processing image")
 
         if not result['detected']:
-            os.remove(image_path)
             raise ValueError("License plate not detected")
 
+        return image_path, result
+
+    @staticmethod
+    def handle_entry(file, name='Unknown', reservation=None):
+        if not file or not allowed_file(file.filename):
+            raise ValueError("Invalid file")
+
+        image_path, result = ParkingService.process_image(file, 'entry', reservation)
+
         license_plate = result['license_plate']
         conf = result['confidence']
-        bbox = result.get('bbox')
-
-        if bbox:
-            try:
-                img_cv = cv2.imread(image_path)
-                x1, y1, x2, y2 = map(int, bbox)
-                cv2.rectangle(img_cv, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(img_cv, f"{license_plate}", (x1, y1-10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                cv2.imwrite(image_path, img_cv)
-            except Exception:
-                pass
 
         existing = ParkingRecord.query.filter_by(license_plate=license_plate, status='parked').first()
         if existing:
+            os.remove(image_path)
             raise ValueError("Vehicle already parked")
 
         # 
@@ -103,6 +114,7 @@ class ParkingService:
         )
         db.session.add(record)
         db.session.commit()
+        response_cache.invalidate()
 
         response = record.to_dict()
         response['has_monthly_ticket'] = has_monthly
@@ -110,43 +122,17 @@ class ParkingService:
         return response
 
     @staticmethod
-    def handle_exit(file):
+    def handle_exit(file, reservation=None):
         if not file or not allowed_file(file.filename):
             raise ValueError("Invalid file")
 
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        unique_filename = f"exit_{timestamp}_{filename}"
-        image_path = os.path.join(Config.UPLOAD_FOLDER, unique_filename)
-        file.save(image_path)
-
-        try:
-            pil_image = preprocess_img(image_path)
-            result = detector.detect_and_recognize(pil_image)
-        except Exception:
-            os.remove(image_path)
-            raise ValueError("Error processing image")
+        image_path, result = ParkingService.process_image(file, 'exit', reservation)
 
-        if not result['detected']:
-            os.remove(image_path)
-            raise ValueError("License plate not detected")
-        
         license_plate = result['license_plate']
-        bbox = result.get('bbox')
-
-        if bbox:
-            try:
-                img_cv = cv2.imread(image_path)
-                x1, y1, x2, y2 = map(int, bbox)
-                cv2.rectangle(img_cv, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(img_cv, f"{license_plate}", (x1, y1-10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                cv2.imwrite(image_path, img_cv)
-            except Exception:
-                pass
 
         record = ParkingRecord.query.filter_by(license_plate=license_plate, status='parked').first()
         if not record:
+            os.remove(image_path)
             raise ValueError("No entry record found for this vehicle")
 
         exit_time = datetime.now()
@@ -157,6 +143,7 @@ class ParkingService:
         record.status = 'exited'
         record.duration = duration
         db.session.commit()
+        response_cache.invalidate()
 
         response = record.to_dict()
 
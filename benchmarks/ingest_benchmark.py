@@ -0,0 +1,127 @@
+"""Compare the old save-then-decode ingest path with the normalized one.
+
+Usage: python benchmarks/ingest_benchmark.py [--image frame.jpg] [--runs 10]
+
+Without --image a synthetic 4000x3000 camera frame is generated. When the
+YOLO/TrOCR models are not loaded, a fixed-box detector stands in so the
+decode, crop and storage costs can still be compared.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.extensions import detector
+from app.ingest import decode_image, resize_max_side, process_upload
+from app.utils import preprocess_img
+from gate_client import prepare_image
+
+
+class FixedBoxDetector:
+
+    def detect_plate(self, image):
+        if not isinstance(image, np.ndarray):
+            image = np.array(image)
+        h, w = image.shape[:2]
+        return {'detected': True, 'bbox': [w * 0.4, h * 0.6, w * 0.6, h * 0.7], 'confidence': 1.0}
+
+    def recognize_text(self, image, bbox=True):
+        if not isinstance(image, np.ndarray):
+            image = np.array(image)
+        if bbox is not None and bbox is not True:
+            x1, y1, x2, y2 = map(int, bbox)
+            image = image[y1:y2, x1:x2]
+        return "30A12345"
+
+    def detect_and_recognize(self, image):
+        result = self.detect_plate(image)
+        self.recognize_text(image, result['bbox'])
+        result['license_plate'] = "30A12345"
+        return result
+
+
+def make_frame(path, width=4000, height=3000):
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    img = np.broadcast_to(gradient, (height, width, 3)).astype(np.float32)
+    img += rng.normal(0, 25, (height, width, 3)).astype(np.float32)
+    cv2.imwrite(path, np.clip(img, 0, 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 95])
+
+
+def legacy_ingest(data, plate_detector, image_path):
+    # Mirrors the previous handle_entry: save raw upload, decode full frame
+    # via PIL, then re-read and re-write it with cv2 for the annotation
+    with open(image_path, 'wb') as f:
+        f.write(data)
+    pil_image = preprocess_img(image_path)
+    result = plate_detector.detect_and_recognize(pil_image)
+    img_cv = cv2.imread(image_path)
+    x1, y1, x2, y2 = map(int, result['bbox'])
+    cv2.rectangle(img_cv, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    cv2.imwrite(image_path, img_cv)
+    return result
+
+
+def timed(fn, runs):
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    plate_detector = detector
+    if not (detector.is_loaded and detector.trocr_loaded):
+        print("Models not loaded, using fixed-box detector")
+        plate_detector = FixedBoxDetector()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image = args.image
+        if not image:
+            image = os.path.join(tmp, 'frame.jpg')
+            make_frame(image)
+
+        with open(image, 'rb') as f:
+            raw = f.read()
+        client = prepare_image(image)
+        stored_path = os.path.join(tmp, 'stored.jpg')
+
+        detect_side = Config.INGEST_DETECT_MAX_SIDE
+        kwargs = dict(detect_max_side=detect_side,
+                      store_max_side=Config.INGEST_STORE_MAX_SIDE,
+                      store_quality=Config.INGEST_STORE_JPEG_QUALITY)
+
+        rows = [
+            ('decode full (PIL)', lambda: preprocess_img(image)),
+            (f'decode + resize to {detect_side}px (cv2)', lambda: resize_max_side(decode_image(raw), detect_side)),
+            ('end-to-end legacy, raw upload', lambda: legacy_ingest(raw, plate_detector, stored_path)),
+            ('end-to-end normalized, raw upload', lambda: process_upload(raw, plate_detector, stored_path, **kwargs)),
+            ('end-to-end normalized, client upload', lambda: process_upload(client, plate_detector, stored_path, **kwargs)),
+        ]
+
+        print(f"upload bytes: raw={len(raw)} client={len(client)} "
+              f"({100 * (1 - len(client) / len(raw)):.1f}% saved)")
+        legacy_ingest(raw, plate_detector, stored_path)
+        legacy_stored = os.path.getsize(stored_path)
+        process_upload(raw, plate_detector, stored_path, **kwargs)
+        print(f"stored bytes: legacy={legacy_stored} normalized={os.path.getsize(stored_path)}")
+
+        for label, fn in rows:
+            print(f"{label:<40} {timed(fn, args.runs):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
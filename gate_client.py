@@ -0,0 +1,87 @@
+import argparse
+import io
+import os
+import cv2
+import numpy as np
+import requests
+from PIL import Image
+
+SERVER_URL = "http://127.0.0.1:5000/parking"
+
+def prepare_image(image_path, max_side=1920, quality=90):
+    """Downscale a camera frame and re-encode it as JPEG before upload.
+
+    The server only runs detection on a downscaled copy, so full sensor
+    resolution is wasted bandwidth; max_side is kept high enough that the
+    plate crop still has enough detail for OCR. JPEGs already within
+    max_side are sent unchanged to avoid another lossy re-encode.
+    """
+    with open(image_path, 'rb') as f:
+        data = f.read()
+
+    try:
+        # Header only, the pixels are not decoded here
+        with Image.open(io.BytesIO(data)) as header:
+            img_format, size = header.format, header.size
+    except Exception:
+        raise ValueError(f"Cannot read image: {image_path}")
+
+    if img_format == 'JPEG' and max(size) <= max_side:
+        return data
+
+    # Orientation is ignored to match how the server decodes uploads
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8),
+                       cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+    if img is None:
+        raise ValueError(f"Cannot read image: {image_path}")
+
+    h, w = img.shape[:2]
+    if max(h, w) > max_side:
+        ratio = max_side / max(h, w)
+        img = cv2.resize(img, (int(w * ratio), int(h * ratio)), interpolation=cv2.INTER_AREA)
+
+    ok, encoded = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Error encoding image")
+    return encoded.tobytes()
+
+def send_gate_image(gate, image_path, lane=None, timeout_ms=None, name=None,
+                    server_url=SERVER_URL, max_side=1920, quality=90):
+    if gate not in ('entry', 'exit'):
+        raise ValueError("gate must be 'entry' or 'exit'")
+
+    data = prepare_image(image_path, max_side, quality)
+
+    headers = {}
+    if lane:
+        headers['X-Lane-Id'] = lane
+    if timeout_ms:
+        headers['X-Request-Timeout-Ms'] = str(timeout_ms)
+
+    form = {'name': name} if name and gate == 'entry' else None
+    timeout = timeout_ms / 1000 + 1 if timeout_ms else 30
+
+    return requests.post(
+        f"{server_url}/{gate}",
+        files={'image': (os.path.basename(image_path), data, 'image/jpeg')},
+        data=form,
+        headers=headers,
+        timeout=timeout
+    )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Upload a gate camera frame')
+    parser.add_argument('gate', choices=['entry', 'exit'])
+    parser.add_argument('image')
+    parser.add_argument('--lane')
+    parser.add_argument('--timeout-ms', type=int)
+    parser.add_argument('--name')
+    parser.add_argument('--server', default=SERVER_URL)
+    parser.add_argument('--max-side', type=int, default=1920)
+    parser.add_argument('--quality', type=int, default=90)
+    args = parser.parse_args()
+
+    response = send_gate_image(args.gate, args.image, lane=args.lane, timeout_ms=args.timeout_ms,
+                               name=args.name, server_url=args.server,
+                               max_side=args.max_side, quality=args.quality)
+    print(response.status_code, response.text)